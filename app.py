@@ -3,15 +3,18 @@ Aplicación Flask para enseñanza interactiva de Topología de Conjuntos
 Autor: Sistema Educativo
 """
 
+import atexit
+import multiprocessing
 import os
+import threading
 from dotenv import load_dotenv
 from flask import Flask, render_template, request, jsonify
+from werkzeug.serving import is_running_from_reloader
 import json
 
 load_dotenv()
 from topology import (
     TopologicalSpace, 
-    set_operations,
     visualize_topology,
     analyze_openness,
     analyze_closedness,
@@ -22,12 +25,101 @@ from topology import (
     check_connectedness,
     check_compactness,
     create_subspace,
-    check_continuity
+    check_continuity,
+    normalize_subset
 )
+from quiz_generator import QuizPool
+from response_cache import FileCache, LRUCache, ResponseCache
+from space_registry import get_registry
+from workers import AnalysisPool, AnalysisUnavailable, TaskTimeoutError
 
 app = Flask(__name__)
 app.config['JSON_AS_ASCII'] = False
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
+app.config['SPACE_REGISTRY'] = os.getenv('SPACE_REGISTRY', os.path.join(app.instance_path, 'spaces.topo'))
+app.config['ANALYSIS_WORKERS'] = int(os.getenv('ANALYSIS_WORKERS', os.cpu_count() or 2))
+app.config['ANALYSIS_TIME_BUDGET'] = float(os.getenv('ANALYSIS_TIME_BUDGET', '5'))
+app.config['ANALYSIS_CPU_BUDGET'] = float(os.getenv('ANALYSIS_CPU_BUDGET', '5'))
+app.config['ANALYSIS_QUEUE_TIMEOUT'] = float(os.getenv('ANALYSIS_QUEUE_TIMEOUT', '0.5'))
+app.config['RESPONSE_CACHE_TTL'] = float(os.getenv('RESPONSE_CACHE_TTL', '300'))
+app.config['RESPONSE_CACHE_ENTRIES'] = int(os.getenv('RESPONSE_CACHE_ENTRIES', '1024'))
+app.config['RESPONSE_CACHE_MAX_BYTES'] = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(16 * 2**20)))
+# Directorio compartido por todos los procesos del servidor (opcional)
+app.config['RESPONSE_CACHE_DIR'] = os.getenv('RESPONSE_CACHE_DIR')
+app.config['RESPONSE_CACHE_DIR_MAX_BYTES'] = int(os.getenv('RESPONSE_CACHE_DIR_MAX_BYTES', str(64 * 2**20)))
+app.config['QUIZ_POOL_SIZE'] = int(os.getenv('QUIZ_POOL_SIZE', '256'))
+
+response_cache = ResponseCache(
+    LRUCache(app.config['RESPONSE_CACHE_ENTRIES'], app.config['RESPONSE_CACHE_MAX_BYTES'],
+             app.config['RESPONSE_CACHE_TTL']),
+    FileCache(app.config['RESPONSE_CACHE_DIR'], app.config['RESPONSE_CACHE_DIR_MAX_BYTES'],
+              app.config['RESPONSE_CACHE_TTL']) if app.config['RESPONSE_CACHE_DIR'] else None
+)
+
+# Cuestionarios precalculados en segundo plano. El hilo no arranca en los
+# procesos de análisis, que también importan este módulo al crearse, ni en
+# el proceso vigilante del recargador de `python app.py`, que no atiende peticiones
+quiz_pool = QuizPool(app.config['QUIZ_POOL_SIZE'])
+_reloader_parent = (__name__ == '__main__' and os.getenv('FLASK_DEBUG', '1') == '1'
+                    and not is_running_from_reloader())
+if multiprocessing.parent_process() is None and not _reloader_parent:
+    quiz_pool.start()
+
+
+def space_registry():
+    """Registro de espacios definidos por el usuario (mapeado en memoria)"""
+    return get_registry(app.config['SPACE_REGISTRY'])
+
+
+_analysis_pool = None
+_analysis_pool_lock = threading.Lock()
+
+
+def analysis_pool():
+    """Pool de procesos para los cálculos costosos (se crea al primer uso)"""
+    global _analysis_pool
+    with _analysis_pool_lock:
+        if _analysis_pool is None:
+            _analysis_pool = AnalysisPool(
+                app.config['SPACE_REGISTRY'],
+                workers=app.config['ANALYSIS_WORKERS'],
+                time_budget=app.config['ANALYSIS_TIME_BUDGET'],
+                cpu_budget=app.config['ANALYSIS_CPU_BUDGET'],
+                queue_timeout=app.config['ANALYSIS_QUEUE_TIMEOUT']
+            )
+            atexit.register(_analysis_pool.shutdown)
+        return _analysis_pool
+
+
+def cached_response(key: str):
+    """Respuesta JSON ya serializada si la petición está en caché"""
+    body = response_cache.get(key)
+    if body is None:
+        return None
+    response = app.response_class(body, mimetype=app.json.mimetype)
+    response.headers['X-Cache'] = 'HIT'
+    return response
+
+
+def cache_json(key: str, payload):
+    """Serializa la respuesta una sola vez y guarda sus bytes en caché"""
+    response = jsonify(payload)
+    response_cache.set(key, response.get_data())
+    response.headers['X-Cache'] = 'MISS'
+    return response
+
+
+def unavailable(error):
+    """Respuesta 503 cuando el análisis no puede atenderse ahora"""
+    response = jsonify({'error': str(error)})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
+
+def over_budget(error):
+    """Respuesta 422 cuando el análisis excede su presupuesto (sin Retry-After)"""
+    return jsonify({'error': str(error)}), 422
+
 
 # Espacios topológicos predefinidos
 predefined_spaces = {
@@ -81,19 +173,70 @@ def interactive():
 @app.route('/api/space-info/<space_type>')
 def get_space_info(space_type):
     """API: Obtener información de un espacio topológico"""
-    if space_type not in predefined_spaces:
-        return jsonify({'error': 'Espacio no encontrado'}), 404
+    if space_type in predefined_spaces:
+        return jsonify(predefined_spaces[space_type])
+    try:
+        if space_type in space_registry():
+            return jsonify(space_registry().metadata(space_type))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'error': 'Espacio no encontrado'}), 404
+
+@app.route('/api/spaces', methods=['POST'])
+def define_space():
+    """API: Registrar un espacio finito definido por el usuario"""
+    data = request.json
     
-    return jsonify(predefined_spaces[space_type])
+    try:
+        universe = set(data.get('universe'))
+        generators = [set(s) for s in data.get('open_sets', [])]
+        if any(not s <= universe for s in generators):
+            raise ValueError('Los abiertos deben ser subconjuntos del universo')
+        # El registro (abiertos mínimos U_x) se calcula en el pool; aquí solo se añade
+        record = analysis_pool().run('encode_space', universe, generators,
+                                     data.get('name', ''), data.get('description', ''))
+        space_id = space_registry().save_record(record)
+        return jsonify(space_registry().metadata(space_id)), 201
+    except TaskTimeoutError as e:
+        return over_budget(e)
+    except AnalysisUnavailable as e:
+        return unavailable(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/spaces')
+def list_spaces():
+    """API: Listar los espacios definidos por el usuario (los puntos, en /api/space-info)"""
+    try:
+        return jsonify([space_registry().summary(key) for key in space_registry().ids()])
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
 
 @app.route('/api/analyze-subset', methods=['POST'])
 def analyze_subset():
     """API: Analizar un subconjunto"""
     data = request.json
     space_type = data.get('space_type')
-    subset = data.get('subset')
+    points = data.get('subset')
     
     try:
+        subset = normalize_subset(points)
+        if isinstance(points, list):
+            # Los puntos conservan su tipo en la clave: [1] y ["1"] son distintos
+            points = sorted({json.dumps(p, sort_keys=True) for p in points})
+            key = ResponseCache.key('analyze-subset', space_type, {'points': points})
+            points = [json.loads(p) for p in points]
+        else:
+            key = ResponseCache.key('analyze-subset', space_type, subset)
+            points = subset
+        cached = cached_response(key)
+        if cached is not None:
+            return cached
+        if space_type not in predefined_spaces and space_type in space_registry():
+            results = analysis_pool().run('analyze_registered_subset', space_type, points,
+                                          space_id=space_type)
+            results['description'] = f"Análisis del conjunto {subset} en {space_registry().summary(space_type)['name']}"
+            return cache_json(key, results)
         # Análisis del subconjunto
         results = {
             'is_open': analyze_openness(space_type, subset),
@@ -104,7 +247,11 @@ def analyze_subset():
             'limit_points': find_limit_points(space_type, subset),
             'description': f"Análisis del conjunto {subset} en {predefined_spaces[space_type]['name']}"
         }
-        return jsonify(results)
+        return cache_json(key, results)
+    except TaskTimeoutError as e:
+        return over_budget(e)
+    except AnalysisUnavailable as e:
+        return unavailable(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -112,18 +259,29 @@ def analyze_subset():
 def perform_set_operation():
     """API: Realizar operación entre conjuntos"""
     data = request.json
+    space_type = data.get('space_type') or 'real_line'
     operation = data.get('operation')
     set_a = data.get('set_a')
     set_b = data.get('set_b')
+    expression = data.get('expression')
     
     try:
-        result = set_operations(operation, set_a, set_b)
+        if expression:
+            return jsonify({
+                'expression': expression,
+                'result': analysis_pool().run('set_expression', expression, space_type)
+            })
+        result = analysis_pool().run('set_operations', operation, set_a, set_b, space_type)
         return jsonify({
             'operation': operation,
             'set_a': set_a,
             'set_b': set_b,
             'result': result
         })
+    except TaskTimeoutError as e:
+        return over_budget(e)
+    except AnalysisUnavailable as e:
+        return unavailable(e)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
@@ -132,6 +290,10 @@ def get_space_properties():
     """API: Obtener propiedades del espacio"""
     data = request.json
     space_type = data.get('space_type')
+    key = ResponseCache.key('space-properties', space_type)
+    cached = cached_response(key)
+    if cached is not None:
+        return cached
     
     try:
         properties = {
@@ -141,10 +303,35 @@ def get_space_properties():
             'is_hausdorff': space_type not in ('indiscrete', 'cofinite'),
             'description': f"Propiedades de {predefined_spaces[space_type]['name']}"
         }
-        return jsonify(properties)
+        return cache_json(key, properties)
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
+@app.route('/api/compactness', methods=['POST'])
+def check_set_compactness():
+    """API: Compacidad de un subconjunto de ℝ y subrecubrimiento finito"""
+    data = request.json
+    target = data.get('set')
+    cover = data.get('cover')
+    
+    try:
+        return jsonify(analysis_pool().run('compactness', target, cover))
+    except TaskTimeoutError as e:
+        return over_budget(e)
+    except AnalysisUnavailable as e:
+        return unavailable(e)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/status')
+def status():
+    """API: Estado del servidor de análisis"""
+    return jsonify({
+        'analysis_pool': analysis_pool().stats(),
+        'response_cache': response_cache.stats(),
+        'quiz_pool': quiz_pool.stats()
+    })
+
 @app.route('/api/generate-visualization', methods=['POST'])
 def generate_visualization():
     """API: Generar visualización de topología"""
@@ -167,70 +354,8 @@ def quiz():
 
 @app.route('/api/quiz-questions')
 def get_quiz_questions():
-    """API: Obtener preguntas del cuestionario"""
-    questions = [
-        {
-            'id': 1,
-            'question': '¿Cuál es la característica principal de un conjunto abierto?',
-            'options': [
-                'Contiene todos sus puntos límite',
-                'No contiene ninguno de sus puntos límite',
-                'Para cada punto, existe una bola abierta contenida en el conjunto',
-                'Es el complemento de un conjunto cerrado'
-            ],
-            'correct': 2,
-            'explanation': 'Un conjunto U en un espacio topológico es abierto si para cada punto x en U, existe una bola abierta B(x) completamente contenida en U.'
-        },
-        {
-            'id': 2,
-            'question': '¿En la topología discreta, qué conjuntos son abiertos?',
-            'options': [
-                'Solo ∅ y X',
-                'Todos los subconjuntos',
-                'Solo los singletons',
-                'Solo conjuntos finitos'
-            ],
-            'correct': 1,
-            'explanation': 'En la topología discreta, TODOS los subconjuntos son abiertos, lo que la hace la topología más fina.'
-        },
-        {
-            'id': 3,
-            'question': '¿Cuál es la relación entre conjuntos abiertos y cerrados?',
-            'options': [
-                'Un conjunto no puede ser ni abierto ni cerrado',
-                'La clausura de un conjunto cerrado es el conjunto mismo',
-                'Todo abierto es cerrado',
-                'En espacios finitos, abierto implica cerrado'
-            ],
-            'correct': 1,
-            'explanation': 'La clausura de un conjunto cerrado A es el mismo conjunto: cl(A) = A. El complemento de un conjunto abierto es cerrado.'
-        },
-        {
-            'id': 4,
-            'question': '¿Qué es el interior de un conjunto?',
-            'options': [
-                'El mayor subconjunto abierto contenido en él',
-                'El complemento del conjunto',
-                'La intersección de todos los cerrados que lo contienen',
-                'El conjunto de puntos límite'
-            ],
-            'correct': 0,
-            'explanation': 'El interior int(A) es el mayor subconjunto abierto contenido en A, o equivalentemente, la unión de todos los abiertos contenidos en A.'
-        },
-        {
-            'id': 5,
-            'question': '¿Cuál es la clausura de un conjunto?',
-            'options': [
-                'El menor conjunto cerrado que contiene el conjunto original',
-                'El conjunto vacío',
-                'El interior del conjunto',
-                'El complemento del conjunto'
-            ],
-            'correct': 0,
-            'explanation': 'La clausura cl(A) es el menor conjunto cerrado que contiene al conjunto A. Equivalentemente, es la intersección de todos los cerrados que contienen A.'
-        }
-    ]
-    return jsonify(questions)
+    """API: Obtener un cuestionario generado por el motor de topología"""
+    return jsonify(quiz_pool.pop())
 
 @app.route('/glossary')
 def glossary():
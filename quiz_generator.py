@@ -0,0 +1,184 @@
+"""
+Generador de preguntas del cuestionario a partir del motor de topología
+
+Cada pregunta se construye sobre un espacio finito aleatorio: se elige un
+subconjunto A y se calcula con el motor su interior, su clausura o su
+frontera; las opciones incorrectas son los otros operadores aplicados a A
+y subconjuntos cercanos. Un hilo en segundo plano mantiene un pool acotado
+de cuestionarios completos, de modo que servir uno nuevo es sacarlo del pool.
+"""
+
+import queue
+import random
+import threading
+from typing import Dict, List
+
+from topology import SpecializationOrder, _format_elements
+
+OPERATORS = {
+    'interior': {
+        'name': 'el interior',
+        'symbol': 'int(A)',
+        'explanation': 'int(A) es la unión de los abiertos contenidos en A: {sets}.'
+    },
+    'closure': {
+        'name': 'la clausura',
+        'symbol': 'cl(A)',
+        'explanation': 'cl(A) es la intersección de los cerrados que contienen a A: {sets}.'
+    },
+    'boundary': {
+        'name': 'la frontera',
+        'symbol': '∂A',
+        'explanation': '∂A = cl(A) \\ int(A) = {closure} \\ {interior}.'
+    }
+}
+
+
+def _format_family(family: List[frozenset]) -> str:
+    return '{' + ', '.join(_format_elements(s) for s in family) + '}'
+
+
+def _sorted_family(family) -> List[frozenset]:
+    return sorted(family, key=lambda s: (len(s), sorted(s)))
+
+
+def random_order(rng: random.Random, min_points: int = 3, max_points: int = 5,
+                 min_open: int = 3, max_open: int = 10) -> SpecializationOrder:
+    """Preorden aleatorio cuya topología tiene entre min_open y max_open abiertos"""
+    while True:
+        universe = list(range(1, rng.randint(min_points, max_points) + 1))
+        pairs = [(x, y) for x in universe for y in universe if x != y and rng.random() < 0.25]
+        order = SpecializationOrder.from_pairs(universe, pairs)
+        if min_open <= len(open_sets(order)) <= max_open:
+            return order
+
+
+def open_sets(order: SpecializationOrder) -> List[frozenset]:
+    """Todos los abiertos (conjuntos superiores) de un espacio pequeño"""
+    labels = order.labels
+    family = []
+    for mask in range(2 ** len(labels)):
+        subset = frozenset(labels[i] for i in range(len(labels)) if mask >> i & 1)
+        if order.is_open(subset):
+            family.append(subset)
+    return _sorted_family(family)
+
+
+def generate_question(rng: random.Random, question_id: int = 1) -> Dict:
+    """Pregunta de opción múltiple sobre interior, clausura o frontera"""
+    order = random_order(rng)
+    universe = frozenset(order.labels)
+    topology = open_sets(order)
+    # Preferir subconjuntos que no sean abiertos ni cerrados
+    for _ in range(10):
+        subset = frozenset(rng.sample(order.labels, rng.randint(1, len(universe) - 1)))
+        if not order.is_open(subset) and not order.is_closed(subset):
+            break
+
+    interior = frozenset(order.interior(subset))
+    closure = frozenset(order.closure(subset))
+    answers = {'interior': interior, 'closure': closure, 'boundary': closure - interior}
+    operator = rng.choice(list(OPERATORS))
+    correct = answers[operator]
+
+    candidates = [answers[other] for other in answers if other != operator]
+    candidates += [subset, universe - subset, frozenset(), universe]
+    distractors = []
+    for candidate in candidates:
+        if candidate != correct and candidate not in distractors:
+            distractors.append(candidate)
+    rng.shuffle(distractors)
+    distractors = distractors[:3]
+    while len(distractors) < 3:
+        candidate = frozenset(p for p in order.labels if rng.random() < 0.5)
+        if candidate != correct and candidate not in distractors:
+            distractors.append(candidate)
+
+    options = distractors + [correct]
+    rng.shuffle(options)
+
+    info = OPERATORS[operator]
+    if operator == 'interior':
+        explanation = info['explanation'].format(
+            sets=_format_family([u for u in topology if u <= subset]))
+    elif operator == 'closure':
+        explanation = info['explanation'].format(
+            sets=_format_family(_sorted_family(universe - u for u in topology if subset <= universe - u)))
+    else:
+        explanation = info['explanation'].format(
+            closure=_format_elements(closure), interior=_format_elements(interior))
+
+    return {
+        'id': question_id,
+        'question': f'En X = {_format_elements(universe)} con la topología τ = {_format_family(topology)}, '
+                    f'¿cuál es {info["name"]} de A = {_format_elements(subset)}?',
+        'options': [f'{info["symbol"]} = {_format_elements(option)}' for option in options],
+        'correct': options.index(correct),
+        'explanation': explanation + f' Por tanto {info["symbol"]} = {_format_elements(correct)}.'
+    }
+
+
+def generate_quiz(rng: random.Random, size: int = 5) -> List[Dict]:
+    """Cuestionario completo de size preguntas"""
+    return [generate_question(rng, i) for i in range(1, size + 1)]
+
+
+class QuizPool:
+    """
+    Pool acotado de cuestionarios generados en segundo plano
+
+    El hilo generador se bloquea cuando el pool está lleno y se reanuda en
+    cuanto se saca un cuestionario, así que no consume CPU mientras no hay
+    demanda.
+    """
+
+    def __init__(self, capacity: int = 256, quiz_size: int = 5, seed: int = None):
+        """
+        Inicializa el pool
+
+        Args:
+            capacity: Número máximo de cuestionarios precalculados
+            quiz_size: Preguntas por cuestionario
+            seed: Semilla del generador aleatorio (para reproducibilidad)
+        """
+        self.capacity = capacity
+        self.quiz_size = quiz_size
+        self._rng = random.Random(seed)
+        self._quizzes = queue.Queue(maxsize=capacity)
+        self._thread = None
+        self._lock = threading.Lock()
+        self.served = 0
+        self.empty = 0
+
+    def start(self):
+        """Arranca el hilo generador (idempotente)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._fill, name='quiz-pool', daemon=True)
+                self._thread.start()
+
+    def _fill(self):
+        while True:
+            self._quizzes.put(generate_quiz(self._rng, self.quiz_size))
+
+    def pop(self) -> List[Dict]:
+        """Saca un cuestionario del pool; si está vacío, genera uno en el momento"""
+        try:
+            quiz = self._quizzes.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.empty += 1
+            # Generador propio de la llamada: las peticiones simultáneas no se esperan
+            return generate_quiz(random.Random(), self.quiz_size)
+        with self._lock:
+            self.served += 1
+        return quiz
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'available': self._quizzes.qsize(),
+                'capacity': self.capacity,
+                'served': self.served,
+                'empty': self.empty
+            }
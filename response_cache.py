@@ -0,0 +1,236 @@
+"""
+Caché de respuestas JSON para los endpoints de análisis
+
+Las respuestas se guardan ya serializadas (bytes), indexadas por la
+petición normalizada. Hay dos niveles: una LRU en memoria por proceso y,
+opcionalmente, un directorio compartido por todos los procesos del
+servidor. Ambos niveles tienen tiempo de vida (TTL) y límite de tamaño.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+_EXPIRY = struct.Struct('<d')
+
+
+class LRUCache:
+    """LRU en memoria acotada por número de entradas y por bytes"""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 2**20, ttl: float = 300):
+        """
+        Inicializa la caché
+
+        Args:
+            max_entries: Número máximo de respuestas
+            max_bytes: Tamaño máximo total de las respuestas
+            ttl: Segundos de validez de cada respuesta
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, body = entry
+            if expires < time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return body
+
+    def set(self, key: str, body: bytes, ttl: float = None):
+        if len(body) > self.max_bytes:
+            return
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (expires, body)
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str):
+        _, body = self._entries.pop(key)
+        self._bytes -= len(body)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes,
+                    'max_entries': self.max_entries, 'max_bytes': self.max_bytes}
+
+
+class FileCache:
+    """
+    Caché compartida entre procesos en un directorio local
+
+    Cada respuesta es un archivo con su instante de expiración seguido del
+    cuerpo. Las escrituras son atómicas (archivo temporal + os.replace), así
+    que los lectores nunca ven una respuesta a medio escribir.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 64 * 2**20, ttl: float = 300,
+                 prune_every: int = 64):
+        """
+        Inicializa la caché
+
+        Args:
+            directory: Directorio compartido por los procesos
+            max_bytes: Tamaño máximo aproximado del directorio
+            ttl: Segundos de validez de cada respuesta
+            prune_every: Escrituras entre dos limpiezas del directorio
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.prune_every = prune_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest())
+
+    def lookup(self, key: str) -> Optional[Tuple[float, bytes]]:
+        """Instante de expiración y cuerpo de una respuesta vigente"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        try:
+            (expires,) = _EXPIRY.unpack_from(data)
+        except struct.error:
+            # Archivo truncado o ajeno a la caché: se trata como un fallo
+            self._unlink(path)
+            return None
+        if expires < time.time():
+            self._unlink(path)
+            return None
+        return expires, data[_EXPIRY.size:]
+
+    def get(self, key: str) -> Optional[bytes]:
+        entry = self.lookup(key)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: str, body: bytes, ttl: float = None):
+        if len(body) > self.max_bytes:
+            return
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(_EXPIRY.pack(expires) + body)
+            os.replace(temporary, self._path(key))
+        except BaseException:
+            self._unlink(temporary)
+            raise
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.prune_every == 0
+        if prune:
+            self.prune()
+
+    def prune(self):
+        """Elimina las respuestas expiradas y las más antiguas si se excede el tamaño"""
+        now, files, total = time.time(), [], 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.tmp'):
+                continue
+            try:
+                stat = entry.stat()
+                with open(entry.path, 'rb') as f:
+                    (expires,) = _EXPIRY.unpack(f.read(_EXPIRY.size))
+            except (OSError, struct.error):
+                continue
+            if expires < now:
+                self._unlink(entry.path)
+            else:
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._unlink(path)
+            total -= size
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict:
+        return {'directory': self.directory, 'max_bytes': self.max_bytes}
+
+
+class ResponseCache:
+    """Caché de dos niveles con estadísticas de aciertos"""
+
+    def __init__(self, local: LRUCache, shared: FileCache = None):
+        self.local = local
+        self.shared = shared
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(*parts) -> str:
+        """Clave estable a partir de las partes normalizadas de la petición"""
+        return json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+
+    def get(self, key: str) -> Optional[bytes]:
+        body = self.local.get(key)
+        if body is not None:
+            with self._lock:
+                self.local_hits += 1
+            return body
+        if self.shared is not None:
+            entry = self.shared.lookup(key)
+            if entry is not None:
+                # En la caché local vive solo lo que le queda en la compartida
+                expires, body = entry
+                self.local.set(key, body, ttl=expires - time.time())
+                with self._lock:
+                    self.shared_hits += 1
+                return body
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, body: bytes):
+        self.local.set(key, body)
+        if self.shared is not None:
+            self.shared.set(key, body)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            hits = self.local_hits + self.shared_hits
+            total = hits + self.misses
+            stats = {
+                'local_hits': self.local_hits,
+                'shared_hits': self.shared_hits,
+                'misses': self.misses,
+                'hit_rate': hits / total if total else 0.0,
+                'ttl': self.local.ttl,
+                'local': self.local.stats()
+            }
+        if self.shared is not None:
+            stats['shared'] = self.shared.stats()
+        return stats
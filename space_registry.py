@@ -0,0 +1,399 @@
+"""
+Registro persistente de espacios topológicos finitos definidos por el usuario
+
+Formato binario (little-endian):
+
+    cabecera   b'TOPO' | versión u16 | reservado u16 | offset del índice u64
+    registros  puntos u32 | abiertos de la base u32
+               | longitud u32 | JSON {name, description}
+               | longitud u32 | JSON con las etiquetas de los puntos
+               | filas U_x, una por punto
+    índice     número de espacios u32 | por espacio: longitud u16, id, offset u64
+
+La fila i es el menor abierto U_x que contiene a x = labels[i], con
+ceil(|X| / 8) bytes (bit j = punto labels[j]). El archivo se abre con mmap
+en modo lectura: todos los procesos que lo usan comparten las mismas
+páginas de la caché del sistema operativo, y las consultas de interior,
+clausura y puntos límite operan directamente sobre ellas.
+
+Los espacios nuevos se añaden al final seguidos de un índice nuevo al que
+pasa a apuntar la cabecera, de modo que los registros nunca se mueven.
+Cuando los índices abandonados ocupan más que los datos vivos, el archivo
+se compacta reescribiéndolo.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Set
+
+import numpy as np
+
+from topology import SpecializationOrder, TopologicalSpace
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+MAGIC = b'TOPO'
+VERSION = 2
+_HEADER = struct.Struct('<4sHHQ')
+_RECORD = struct.Struct('<III')
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+_U64 = struct.Struct('<Q')
+
+
+def _json(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_space(space, name: str = '', description: str = '') -> bytes:
+    """Serializa un espacio finito (o su preorden de especialización) en un registro binario"""
+    order = space.specialization_order() if isinstance(space, TopologicalSpace) else space
+    labels = order.labels
+    if any(not isinstance(label, (str, int, float)) for label in labels):
+        raise ValueError('Los puntos deben ser números o cadenas de texto')
+    # reach[i, j] sii labels[j] ∈ U_x con x = labels[i]
+    rows = np.packbits(order.reach, axis=1, bitorder='little')
+    basis = len(np.unique(rows, axis=0)) if labels else 0
+    info = _json({'name': name, 'description': description})
+    encoded_labels = _json(labels)
+    return (_RECORD.pack(len(labels), basis, len(info)) + info
+            + _U32.pack(len(encoded_labels)) + encoded_labels + rows.tobytes())
+
+
+def space_id(record: bytes) -> str:
+    """Identificador por contenido: espacios idénticos comparten id"""
+    return hashlib.sha1(record).hexdigest()[:12]
+
+
+class PackedSpace:
+    """
+    Espacio finito consultado directamente sobre sus filas de bits U_x
+
+    Las filas suelen ser una vista del archivo mapeado: interior, clausura y
+    puntos límite se calculan con operaciones de bytes por bloques, sin
+    desempaquetarlas. La memoria propia del proceso es O(|X|) (etiquetas e
+    índice) más un bloque de trabajo.
+    """
+
+    def __init__(self, labels: List, rows: np.ndarray, block_bytes: int = 2**20):
+        """
+        Inicializa el espacio
+
+        Args:
+            labels: Puntos del espacio, en el orden de las filas y de los bits
+            rows: Matriz uint8 (|X|, ceil(|X| / 8)) con U_x empaquetado
+            block_bytes: Tamaño aproximado de los bloques de trabajo
+        """
+        self.labels = labels
+        self.index = {label: i for i, label in enumerate(labels)}
+        self.rows = rows
+        self.block_rows = max(1, block_bytes // max(1, rows.shape[1]))
+        # Memoria propia estimada (las filas viven en el mmap compartido)
+        self.nbytes = (sys.getsizeof(labels) + sys.getsizeof(self.index)
+                       + sum(sys.getsizeof(label) for label in labels))
+
+    def _mask(self, subset: Set) -> np.ndarray:
+        """Fila empaquetada de pertenencia a subset"""
+        mask = np.zeros(len(self.labels), dtype=bool)
+        try:
+            mask[[self.index[p] for p in subset]] = True
+        except KeyError as e:
+            raise ValueError(f'El punto {e.args[0]} no pertenece al espacio')
+        return np.packbits(mask, bitorder='little')
+
+    def _select(self, test) -> Set:
+        """Puntos x cuya fila U_x cumple test, evaluado por bloques de filas"""
+        selected = []
+        for start in range(0, len(self.labels), self.block_rows):
+            block = self.rows[start:start + self.block_rows]
+            selected.append(start + np.flatnonzero(test(block, start)))
+        return {self.labels[i] for i in np.concatenate(selected)} if selected else set()
+
+    def interior(self, subset: Set) -> Set:
+        """int(A) = {x : U_x ⊆ A}"""
+        outside = ~self._mask(subset)
+        return self._select(lambda block, start: ~(block & outside).any(axis=1))
+
+    def closure(self, subset: Set) -> Set:
+        """cl(A) = {x : U_x ∩ A ≠ ∅}"""
+        mask = self._mask(subset)
+        return self._select(lambda block, start: (block & mask).any(axis=1))
+
+    def limit_points(self, subset: Set) -> Set:
+        """x es punto límite de A sii U_x contiene un punto de A distinto de x"""
+        mask = self._mask(subset)
+
+        def test(block, start):
+            hits = block & mask
+            own = np.arange(start, start + len(block))
+            hits[np.arange(len(block)), own >> 3] &= ~(1 << (own & 7)).astype(np.uint8)
+            return hits.any(axis=1)
+
+        return self._select(test)
+
+
+class _Layout(NamedTuple):
+    """Posiciones de los campos de un registro dentro del archivo"""
+    points: int
+    basis: int
+    info: slice
+    labels: slice
+    rows: int
+    end: int
+
+
+class SpaceRegistry:
+    """
+    Registro de espacios finitos respaldado por un archivo mapeado en memoria
+
+    Solo el índice (id -> offset) se lee al abrir el archivo; los registros
+    se decodifican bajo demanda. Si otro proceso modifica el archivo, el
+    siguiente acceso detecta el cambio y vuelve a mapearlo.
+    """
+
+    def __init__(self, path: str, compact_ratio: float = 2.0):
+        """
+        Inicializa el registro
+
+        Args:
+            path: Ruta del archivo binario (se crea al guardar el primer espacio)
+            compact_ratio: Tamaño del archivo, relativo a los datos vivos, a
+                partir del cual se compacta
+        """
+        self.path = path
+        self.compact_ratio = compact_ratio
+        self._lock = threading.Lock()
+        self._file = None
+        self._map = None
+        self._stat = None
+        self._offsets = {}
+
+    # Lectura
+
+    def _refresh(self):
+        """Vuelve a mapear el archivo si cambió desde la última lectura"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._close()
+            return
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if key == self._stat:
+            return
+        self._close()
+        if stat.st_size < _HEADER.size:
+            raise ValueError(f'{self.path} no es un registro de espacios válido')
+        self._file = open(self.path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, index_offset = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError()
+            self._offsets = self._read_index(index_offset)
+        except (ValueError, struct.error, UnicodeDecodeError):
+            self._close()
+            raise ValueError(f'{self.path} no es un registro de espacios válido') from None
+        self._stat = key
+
+    def _read_index(self, offset: int) -> Dict[str, int]:
+        (count,), offset = _U32.unpack_from(self._map, offset), offset + _U32.size
+        offsets = {}
+        for _ in range(count):
+            (length,), offset = _U16.unpack_from(self._map, offset), offset + _U16.size
+            key = bytes(self._map[offset:offset + length]).decode('utf-8')
+            offset += length
+            offsets[key], offset = _U64.unpack_from(self._map, offset)[0], offset + _U64.size
+        return offsets
+
+    def _close(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Hay vistas (PackedSpace) sobre el mapeo: se libera al desaparecer la última
+                pass
+            self._file.close()
+        self._file = self._map = self._stat = None
+        self._offsets = {}
+
+    def close(self):
+        """Libera el mapeo del archivo"""
+        with self._lock:
+            self._close()
+
+    def ids(self) -> List[str]:
+        """Identificadores de los espacios registrados"""
+        with self._lock:
+            self._refresh()
+            return list(self._offsets)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return key in self._offsets
+
+    def _layout(self, key: str) -> _Layout:
+        self._refresh()
+        if key not in self._offsets:
+            raise KeyError(key)
+        return self._layout_at(self._offsets[key])
+
+    def _layout_at(self, offset: int) -> _Layout:
+        points, basis, info_length = _RECORD.unpack_from(self._map, offset)
+        info = slice(offset + _RECORD.size, offset + _RECORD.size + info_length)
+        (labels_length,) = _U32.unpack_from(self._map, info.stop)
+        labels = slice(info.stop + _U32.size, info.stop + _U32.size + labels_length)
+        return _Layout(points, basis, info, labels, labels.stop,
+                       labels.stop + points * ((points + 7) // 8))
+
+    def summary(self, key: str) -> Dict:
+        """Nombre y tamaño de un espacio, sin decodificar sus puntos"""
+        with self._lock:
+            layout = self._layout(key)
+            info = json.loads(bytes(self._map[layout.info]).decode('utf-8'))
+        return {'id': key, 'name': info['name'], 'points': layout.points, 'basis': layout.basis}
+
+    def metadata(self, key: str) -> Dict:
+        """Nombre, descripción, tamaño y puntos de un espacio"""
+        with self._lock:
+            layout = self._layout(key)
+            info = json.loads(bytes(self._map[layout.info]).decode('utf-8'))
+            labels = json.loads(bytes(self._map[layout.labels]).decode('utf-8'))
+        return dict(info, id=key, points=layout.points, basis=layout.basis, labels=labels)
+
+    def space(self, key: str) -> PackedSpace:
+        """Espacio consultable sobre una vista sin copia de sus filas U_x"""
+        with self._lock:
+            layout = self._layout(key)
+            labels = json.loads(bytes(self._map[layout.labels]).decode('utf-8'))
+            rows = np.frombuffer(self._map, dtype=np.uint8, count=layout.end - layout.rows,
+                                 offset=layout.rows)
+        return PackedSpace(labels, rows.reshape(layout.points, (layout.points + 7) // 8))
+
+    def load(self, key: str) -> TopologicalSpace:
+        """Decodifica un espacio registrado"""
+        with self._lock:
+            layout = self._layout(key)
+            labels = json.loads(bytes(self._map[layout.labels]).decode('utf-8'))
+            packed = np.frombuffer(self._map, dtype=np.uint8, count=layout.end - layout.rows,
+                                   offset=layout.rows)
+            reach = np.unpackbits(packed.reshape(layout.points, (layout.points + 7) // 8), axis=1,
+                                  count=layout.points, bitorder='little').astype(bool)
+            # La vista no debe sobrevivir al bloqueo: impediría cerrar el mapeo
+            del packed
+        return SpecializationOrder(labels, reach, transitive=True).to_space()
+
+    # Escritura
+
+    @contextmanager
+    def _exclusive(self):
+        """Bloqueo entre procesos para modificar el archivo"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path + '.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def save(self, space, name: str = '', description: str = '') -> str:
+        """Guarda un espacio (o su preorden de especialización) y devuelve su identificador"""
+        return self.save_record(encode_space(space, name, description))
+
+    def save_record(self, record: bytes) -> str:
+        """
+        Guarda un registro ya codificado con encode_space y devuelve su identificador
+
+        El registro y un índice nuevo se añaden al final del archivo y solo
+        después se actualiza la cabecera, de modo que un lector nunca ve un
+        índice a medio escribir y los mapeos existentes siguen siendo válidos.
+        """
+        key = space_id(record)
+        with self._exclusive(), self._lock:
+            self._refresh()
+            if key in self._offsets:
+                return key
+            if self._map is None:
+                self._rewrite([(key, record)])
+            else:
+                live = _HEADER.size + sum(self._layout_at(offset).end - offset
+                                          for offset in self._offsets.values())
+                size, index_size = self._append(key, record)
+                if size > self.compact_ratio * (live + len(record) + index_size):
+                    self._refresh()
+                    self._compact()
+            self._refresh()
+        return key
+
+    @staticmethod
+    def _encode_index(offsets: Dict[str, int]) -> bytes:
+        parts = [_U32.pack(len(offsets))]
+        for key, offset in offsets.items():
+            encoded = key.encode('utf-8')
+            parts.append(_U16.pack(len(encoded)) + encoded + _U64.pack(offset))
+        return b''.join(parts)
+
+    def _append(self, key: str, record: bytes):
+        """Añade un registro y un índice nuevo; devuelve el tamaño del archivo y del índice"""
+        offsets = dict(self._offsets)
+        with open(self.path, 'r+b') as out:
+            out.seek(0, os.SEEK_END)
+            offsets[key] = out.tell()
+            out.write(record)
+            index_offset = out.tell()
+            index = self._encode_index(offsets)
+            out.write(index)
+            out.flush()
+            os.fsync(out.fileno())
+            out.seek(0)
+            out.write(_HEADER.pack(MAGIC, VERSION, 0, index_offset))
+            return index_offset + len(index), len(index)
+
+    def _compact(self):
+        """Reescribe el archivo sin los índices abandonados"""
+        self._rewrite((key, self._map[offset:self._layout_at(offset).end])
+                      for key, offset in self._offsets.items())
+
+    def _rewrite(self, records):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                out.write(b'\0' * _HEADER.size)
+                offsets = {}
+                for key, record in records:
+                    offsets[key] = out.tell()
+                    out.write(record)
+                index_offset = out.tell()
+                out.write(self._encode_index(offsets))
+                out.seek(0)
+                out.write(_HEADER.pack(MAGIC, VERSION, 0, index_offset))
+            os.replace(temporary, self.path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_registry(path: str) -> SpaceRegistry:
+    """Registro compartido por todos los hilos del proceso para una ruta"""
+    with _registries_lock:
+        if path not in _registries:
+            _registries[path] = SpaceRegistry(path)
+        return _registries[path]
@@ -167,6 +167,7 @@ function performOperation() {
             'Content-Type': 'application/json'
         },
         body: JSON.stringify({
+            space_type: currentSpace,
             operation: operation,
             set_a: setA,
             set_b: setB
@@ -174,6 +175,10 @@ function performOperation() {
     })
     .then(response => response.json())
     .then(data => {
+        if (data.error) {
+            showNotification(data.error, 'error');
+            return;
+        }
         document.getElementById('operation-result').textContent = 
             `${data.set_a} ${getOperationSymbol(data.operation)} ${data.set_b} = ${data.result}`;
         document.getElementById('operation-results').style.display = 'block';
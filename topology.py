@@ -2,9 +2,15 @@
 Módulo de Topología de Conjuntos - Funciones matemáticas y análisis
 """
 
+import heapq
+import math
+import re
+import sys
+import threading
+from collections import OrderedDict
 import numpy as np
 import matplotlib.pyplot as plt
-from typing import Set, List, Tuple, Dict
+from typing import Set, List, Tuple, Dict, NamedTuple, Callable, Optional
 import matplotlib.patches as patches
 
 class TopologicalSpace:
@@ -17,6 +23,7 @@ class TopologicalSpace:
         Args:
             universe: El conjunto universal X
             open_sets: Lista de conjuntos abiertos que forman la topología
+                (o una base de ella; interior y clausura se calculan igual)
         """
         self.universe = universe
         self.open_sets = [set(s) for s in open_sets]
@@ -33,12 +40,12 @@ class TopologicalSpace:
     def is_open(self, subset: Set) -> bool:
         """Verifica si un conjunto es abierto"""
         subset = set(subset)
-        return subset in self.open_sets
+        return subset in self.open_sets or self.interior(subset) == subset
     
     def is_closed(self, subset: Set) -> bool:
         """Verifica si un conjunto es cerrado"""
         subset = set(subset)
-        return subset in self.closed_sets or subset == self.universe - (self.universe - subset)
+        return subset in self.closed_sets or self.closure(subset) == subset
     
     def interior(self, subset: Set) -> Set:
         """Calcula el interior de un conjunto"""
@@ -81,6 +88,1145 @@ class TopologicalSpace:
                 limit_pts.add(point)
         return limit_pts
 
+    def specialization_order(self) -> 'SpecializationOrder':
+        """Devuelve el preorden de especialización del espacio (finito)"""
+        return SpecializationOrder.from_space(self)
+
+
+# Espacios métricos finitos construidos a partir de datos
+
+def _as_points(points) -> np.ndarray:
+    """Convierte una nube de puntos en una matriz (n, d) de flotantes"""
+    points = np.asarray(points, dtype=float)
+    if points.ndim == 1:
+        points = points.reshape(-1, 1)
+    if points.ndim != 2:
+        raise ValueError('La nube de puntos debe ser una matriz (n, d)')
+    return points
+
+
+def _as_distances(distances) -> np.ndarray:
+    """Valida una matriz de distancias cuadrada"""
+    distances = np.asarray(distances, dtype=float)
+    if distances.ndim != 2 or distances.shape[0] != distances.shape[1]:
+        raise ValueError('La matriz de distancias debe ser cuadrada')
+    return distances
+
+
+def _distance_blocks(points=None, distances=None, chunk_size: int = 256):
+    """
+    Genera la matriz de distancias por bloques de filas
+
+    Cada bloque tiene a lo sumo chunk_size filas, de modo que la memoria
+    intermedia es O(chunk_size · n · d) y no O(n² · d).
+
+    Yields:
+        Pares (rango de filas, bloque de distancias de forma (filas, n))
+    """
+    if (points is None) == (distances is None):
+        raise ValueError('Debe indicarse una nube de puntos o una matriz de distancias')
+    if chunk_size < 1:
+        raise ValueError('chunk_size debe ser positivo')
+
+    if distances is not None:
+        distances = _as_distances(distances)
+        n = distances.shape[0]
+        for start in range(0, n, chunk_size):
+            rows = slice(start, min(start + chunk_size, n))
+            yield rows, distances[rows]
+        return
+
+    points = _as_points(points)
+    n = points.shape[0]
+    for start in range(0, n, chunk_size):
+        rows = slice(start, min(start + chunk_size, n))
+        diff = points[rows, None, :] - points[None, :, :]
+        yield rows, np.sqrt(np.einsum('ijk,ijk->ij', diff, diff))
+
+
+def _prepare_input(points, distances):
+    """Valida la entrada y devuelve (points, distances, n) ya convertidos"""
+    if (points is None) == (distances is None):
+        raise ValueError('Debe indicarse una nube de puntos o una matriz de distancias')
+    if distances is not None:
+        distances = _as_distances(distances)
+        return None, distances, distances.shape[0]
+    points = _as_points(points)
+    return points, None, points.shape[0]
+
+
+def _ball_matrix(block: np.ndarray, epsilon) -> np.ndarray:
+    """Pertenencia a bolas abiertas: B[x, y] indica d(x, y) < ε"""
+    if epsilon is None:
+        # Radio arbitrariamente pequeño: solo los puntos a distancia cero
+        return block == 0
+    return block < epsilon
+
+
+def _minimal_neighborhoods(generators: np.ndarray, chunk_size: int = 256) -> np.ndarray:
+    """
+    Calcula el menor abierto U_x que contiene a cada punto
+
+    generators[g, x] indica si el punto x pertenece al generador g (una bola
+    B(y, ε), o un abierto de la topología). U_x es la intersección de todos
+    los generadores que contienen a x, es decir, z ∈ U_x sii z pertenece a
+    todos ellos. Contando con un producto matricial cuántos de los
+    generadores que contienen a x contienen también a z, basta comparar con
+    el número total de generadores que contienen a x. Los conteos en
+    float32 son exactos hasta 2²⁴ generadores.
+    """
+    n = generators.shape[1]
+    as_float = generators.astype(np.float32)
+    # Cantidad de generadores que contienen a cada punto
+    degree = as_float.sum(axis=0)
+    neighborhoods = np.empty((n, n), dtype=bool)
+    for start in range(0, n, chunk_size):
+        rows = slice(start, min(start + chunk_size, n))
+        counts = as_float[:, rows].T @ as_float
+        neighborhoods[rows] = counts == degree[rows, None]
+    return neighborhoods
+
+
+def _space_from_neighborhoods(neighborhoods: np.ndarray, labels: List) -> TopologicalSpace:
+    """Construye el espacio cuya base son los abiertos mínimos distintos"""
+    universe = set(labels)
+    packed = np.unique(np.packbits(neighborhoods, axis=1), axis=0)
+    rows = np.unpackbits(packed, axis=1, count=neighborhoods.shape[1]).astype(bool)
+    basis = [{labels[i] for i in np.flatnonzero(row)} for row in rows]
+    open_sets = [set()] + [b for b in basis if b and b != universe] + [universe]
+    return TopologicalSpace(universe, open_sets)
+
+
+def _radius_levels(points, distances, radii: np.ndarray, n: int, chunk_size: int = 256):
+    """
+    Nivel de cada par de puntos: número de radios ≤ d(x, y)
+
+    y ∈ B(x, radii[k]) sii el nivel del par es ≤ k, así que una sola matriz
+    de enteros pequeños codifica las bolas de todos los radios. Se calcula
+    por bloques de filas sin guardar ninguna distancia.
+
+    Returns:
+        Matriz de niveles (n, n) y número de pares en cada nivel
+    """
+    levels = np.empty((n, n), dtype=np.min_scalar_type(len(radii)))
+    histogram = np.zeros(len(radii) + 1, dtype=np.int64)
+    for rows, block in _distance_blocks(points, distances, chunk_size):
+        block_levels = np.searchsorted(radii, block, side='right')
+        levels[rows] = block_levels
+        histogram += np.bincount(block_levels.ravel(), minlength=len(radii) + 1)
+    return levels, histogram
+
+
+def _add_ball_counts(counts: np.ndarray, degree: np.ndarray, balls: np.ndarray,
+                     sign: int, chunk_size: int = 256):
+    """Suma (sign=1) o resta (sign=-1) unas filas de generadores a los conteos de _minimal_neighborhoods"""
+    n = counts.shape[0]
+    balls = balls.astype(np.float32)
+    degree += sign * balls.sum(axis=0)
+    for start in range(0, n, chunk_size):
+        rows = slice(start, min(start + chunk_size, n))
+        counts[rows] += sign * (balls[:, rows].T @ balls)
+
+
+def _resolve_labels(labels, n: int) -> List:
+    """Etiquetas de los puntos (por defecto sus índices 0..n-1)"""
+    if labels is None:
+        return list(range(n))
+    labels = list(labels)
+    if len(labels) != n or len(set(labels)) != n:
+        raise ValueError('Se necesita una etiqueta distinta por cada punto')
+    return labels
+
+
+def metric_space(points=None, distances=None, epsilon: float = None,
+                 labels: List = None, chunk_size: int = 256) -> TopologicalSpace:
+    """
+    Construye la topología de un espacio métrico finito
+
+    Sin epsilon se obtiene la topología métrica: los abiertos mínimos son
+    las clases de puntos a distancia cero (la topología discreta si d es
+    una métrica). Con epsilon se obtiene la topología generada por las
+    bolas abiertas B(x, ε) = {y : d(x, y) < ε}.
+
+    Args:
+        points: Nube de puntos de forma (n, d) o (n,)
+        distances: Matriz de distancias (n, n), alternativa a points
+        epsilon: Radio de las bolas generadoras
+        labels: Etiquetas de los puntos (por defecto 0..n-1)
+        chunk_size: Filas procesadas por bloque
+
+    Returns:
+        TopologicalSpace cuya lista de abiertos es una base de la topología
+    """
+    if epsilon is not None and epsilon <= 0:
+        raise ValueError('epsilon debe ser positivo')
+
+    points, distances, n = _prepare_input(points, distances)
+    labels = _resolve_labels(labels, n)
+    if n == 0:
+        return TopologicalSpace(set(), [set()])
+
+    # Cada bloque de distancias se umbraliza y se descarta en seguida
+    balls = np.empty((n, n), dtype=bool)
+    for rows, block in _distance_blocks(points, distances, chunk_size):
+        balls[rows] = _ball_matrix(block, epsilon)
+    return _space_from_neighborhoods(_minimal_neighborhoods(balls, chunk_size), labels)
+
+
+def epsilon_sweep(epsilons: List[float], points=None, distances=None,
+                  labels: List = None, chunk_size: int = 256) -> List[Tuple[float, TopologicalSpace]]:
+    """
+    Construye la topología de las ε-bolas para varios radios
+
+    Las distancias se calculan una sola vez, por bloques, y se reducen al
+    nivel de cada par (cuántos radios no la superan). Dos radios consecutivos
+    sin ningún par entre ellos generan la misma topología, y el espacio ya
+    construido se reutiliza. Como las bolas crecen con el radio, los conteos
+    de _minimal_neighborhoods se actualizan solo con los generadores cuya
+    bola cambió, en lugar de recalcular el producto completo.
+
+    Returns:
+        Lista de pares (ε, espacio) ordenada por ε creciente
+    """
+    if any(eps <= 0 for eps in epsilons):
+        raise ValueError('Todos los radios deben ser positivos')
+
+    points, distances, n = _prepare_input(points, distances)
+    labels = _resolve_labels(labels, n)
+    if n == 0:
+        empty = TopologicalSpace(set(), [set()])
+        return [(eps, empty) for eps in sorted(epsilons)]
+
+    radii = np.unique(np.asarray(epsilons, dtype=float))
+    levels, histogram = _radius_levels(points, distances, radii, n, chunk_size)
+    counts = np.zeros((n, n), dtype=np.float32)
+    degree = np.zeros(n, dtype=np.float32)
+    spaces, computed = [], None
+    for k in range(len(radii)):
+        if computed is not None and not histogram[computed + 1:k + 1].any():
+            spaces.append(spaces[-1])
+            continue
+        if computed is None:
+            changed = np.arange(n)
+        else:
+            # Generadores B(y, ε) que crecieron desde el último radio calculado
+            changed = np.concatenate([
+                start + np.flatnonzero(((block > computed) & (block <= k)).any(axis=1))
+                for start, block in ((s, levels[s:s + chunk_size]) for s in range(0, n, chunk_size))
+            ])
+        previous = computed
+        if computed is None or 2 * len(changed) >= n:
+            # Actualizar costaría más que recalcular
+            counts[:] = 0
+            degree[:] = 0
+            changed, previous = np.arange(n), None
+        for start in range(0, len(changed), chunk_size):
+            block = levels[changed[start:start + chunk_size]]
+            if previous is not None:
+                _add_ball_counts(counts, degree, block <= previous, -1, chunk_size)
+            _add_ball_counts(counts, degree, block <= k, 1, chunk_size)
+        computed = k
+        spaces.append(_space_from_neighborhoods(counts == degree[:, None], labels))
+
+    by_radius = dict(zip(radii.tolist(), spaces))
+    return [(eps, by_radius[float(eps)]) for eps in sorted(epsilons)]
+
+
+# Vista de Alexandrov: preorden de especialización de un espacio finito
+
+def _compose(left: np.ndarray, right: np.ndarray, chunk_size: int = 256) -> np.ndarray:
+    """Producto booleano de relaciones: (x, z) sii existe y con left[x, y] y right[y, z]"""
+    n = left.shape[0]
+    right = right.astype(np.float32)
+    result = np.empty((n, right.shape[1]), dtype=bool)
+    for start in range(0, n, chunk_size):
+        rows = slice(start, min(start + chunk_size, n))
+        result[rows] = (left[rows].astype(np.float32) @ right) > 0
+    return result
+
+
+def _ordered_labels(universe) -> List:
+    """Lista estable de los puntos del universo"""
+    try:
+        return sorted(universe)
+    except TypeError:
+        return list(universe)
+
+
+class SpecializationOrder:
+    """
+    Preorden de especialización de un espacio topológico finito
+
+    x ≤ y sii x ∈ cl({y}), o equivalentemente, todo abierto que contiene a x
+    contiene a y. La topología se recupera como la familia de conjuntos
+    superiores (up-sets), por lo que basta guardar la matriz de
+    alcanzabilidad de tamaño |X|² en lugar de hasta 2^|X| abiertos.
+    """
+
+    def __init__(self, labels: List, relation: np.ndarray, chunk_size: int = 256,
+                 transitive: bool = False):
+        """
+        Inicializa el preorden
+
+        Args:
+            labels: Puntos del espacio, en el orden de las filas de relation
+            relation: Matriz booleana (n, n) con relation[i, j] sii labels[i] ≤ labels[j];
+                se cierra reflexiva y transitivamente
+            chunk_size: Filas procesadas por bloque en los productos booleanos
+            transitive: Indica que relation ya es transitiva (se omite el cierre)
+        """
+        self.labels = list(labels)
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        if len(self.index) != len(self.labels):
+            raise ValueError('Las etiquetas de los puntos deben ser distintas')
+
+        n = len(self.labels)
+        relation = np.asarray(relation, dtype=bool)
+        if relation.shape != (n, n):
+            raise ValueError('La relación debe ser una matriz cuadrada de tamaño |X|')
+        self.chunk_size = chunk_size
+        relation = relation | np.eye(n, dtype=bool)
+        self.reach = relation if transitive else self._transitive_closure(relation)
+
+    def _transitive_closure(self, relation: np.ndarray) -> np.ndarray:
+        """Cierre transitivo por elevación al cuadrado (O(log n) productos)"""
+        while True:
+            extended = relation | _compose(relation, relation, self.chunk_size)
+            if np.array_equal(extended, relation):
+                return relation
+            relation = extended
+
+    @classmethod
+    def from_space(cls, space: TopologicalSpace, chunk_size: int = 256) -> 'SpecializationOrder':
+        """Obtiene el preorden a partir de los abiertos (o una base) de un espacio finito"""
+        labels = _ordered_labels(space.universe)
+        index = {label: i for i, label in enumerate(labels)}
+        generators = np.zeros((len(space.open_sets), len(labels)), dtype=bool)
+        for row, open_set in enumerate(space.open_sets):
+            generators[row, [index[p] for p in open_set]] = True
+        return cls.from_generators(labels, generators, chunk_size)
+
+    @classmethod
+    def from_generators(cls, labels: List, generators: np.ndarray,
+                        chunk_size: int = 256) -> 'SpecializationOrder':
+        """
+        Obtiene el preorden a partir de una matriz booleana (abiertos × puntos)
+
+        Las columnas siguen el orden de labels. Los abiertos mínimos U_x ya
+        forman una relación transitiva, por lo que no hace falta cerrarla.
+        """
+        # y ∈ U_x sii x ≤ y
+        return cls(labels, _minimal_neighborhoods(generators, chunk_size), chunk_size,
+                   transitive=True)
+
+    @classmethod
+    def from_pairs(cls, universe, pairs, chunk_size: int = 256) -> 'SpecializationOrder':
+        """Construye el preorden generado por pares (x, y) con x ≤ y"""
+        labels = _ordered_labels(universe)
+        index = {label: i for i, label in enumerate(labels)}
+        relation = np.zeros((len(labels), len(labels)), dtype=bool)
+        for x, y in pairs:
+            relation[index[x], index[y]] = True
+        return cls(labels, relation, chunk_size)
+
+    def to_space(self) -> TopologicalSpace:
+        """Espacio de Alexandrov cuya base son los conjuntos superiores ↑x"""
+        if not self.labels:
+            return TopologicalSpace(set(), [set()])
+        return _space_from_neighborhoods(self.reach, self.labels)
+
+    def _mask(self, subset: Set) -> np.ndarray:
+        """Vector booleano de pertenencia a subset"""
+        mask = np.zeros(len(self.labels), dtype=bool)
+        try:
+            mask[[self.index[p] for p in subset]] = True
+        except KeyError as e:
+            raise ValueError(f'El punto {e.args[0]} no pertenece al espacio')
+        return mask
+
+    def _to_set(self, mask: np.ndarray) -> Set:
+        return {self.labels[i] for i in np.flatnonzero(mask)}
+
+    def up_set(self, subset: Set) -> Set:
+        """↑A = {y : x ≤ y para algún x ∈ A}, el menor abierto que contiene a A"""
+        return self._to_set(self.reach[self._mask(subset)].any(axis=0))
+
+    def down_set(self, subset: Set) -> Set:
+        """↓A = {x : x ≤ y para algún y ∈ A}, el menor cerrado que contiene a A"""
+        return self._to_set(self.reach[:, self._mask(subset)].any(axis=1))
+
+    def interior(self, subset: Set) -> Set:
+        """int(A) = {x : ↑x ⊆ A}"""
+        outside = ~self._mask(subset)
+        return self._to_set(~self.reach[:, outside].any(axis=1))
+
+    def closure(self, subset: Set) -> Set:
+        """cl(A) = ↓A"""
+        return self.down_set(subset)
+
+    def limit_points(self, subset: Set) -> Set:
+        """x es punto límite de A sii ↑x contiene un punto de A distinto de x"""
+        mask = self._mask(subset)
+        count = self.reach[:, mask].sum(axis=1) - mask
+        return self._to_set(count > 0)
+
+    def is_open(self, subset: Set) -> bool:
+        """Un conjunto es abierto sii es un conjunto superior"""
+        return self.up_set(subset) == set(subset)
+
+    def is_closed(self, subset: Set) -> bool:
+        """Un conjunto es cerrado sii es un conjunto inferior"""
+        return self.down_set(subset) == set(subset)
+
+    def equivalence_classes(self) -> List[frozenset]:
+        """Clases de puntos topológicamente indistinguibles (x ≤ y y y ≤ x)"""
+        symmetric = self.reach & self.reach.T
+        classes, seen = [], np.zeros(len(self.labels), dtype=bool)
+        for i in range(len(self.labels)):
+            if not seen[i]:
+                members = symmetric[i]
+                seen |= members
+                classes.append(frozenset(self._to_set(members)))
+        return classes
+
+    def hasse_diagram(self) -> List[Tuple[frozenset, frozenset]]:
+        """
+        Diagrama de Hasse del orden parcial cociente
+
+        Se calcula la reducción transitiva: x ⋖ y sii x < y y no existe z con
+        x < z < y, es decir, el orden estricto menos su composición consigo
+        mismo. Los vértices son las clases de equivalencia (conjuntos unitarios
+        si el espacio es T0).
+        """
+        classes = self.equivalence_classes()
+        representatives = [self.index[next(iter(c))] for c in classes]
+        reach = self.reach[np.ix_(representatives, representatives)]
+        strict = reach & ~reach.T
+        covers = strict & ~_compose(strict, strict, self.chunk_size)
+        return [(classes[i], classes[j]) for i, j in zip(*np.nonzero(covers))]
+
+    def is_t0(self) -> bool:
+        """El espacio es T0 sii el preorden es antisimétrico"""
+        return not (self.reach & self.reach.T & ~np.eye(len(self.labels), dtype=bool)).any()
+
+
+# Compacidad: extracción de subrecubrimientos finitos
+
+class Interval(NamedTuple):
+    """Intervalo de la recta real con extremos abiertos o cerrados"""
+    lo: float
+    hi: float
+    lo_closed: bool = False
+    hi_closed: bool = False
+
+    def is_empty(self) -> bool:
+        return self.lo > self.hi or (self.lo == self.hi and not (self.lo_closed and self.hi_closed))
+
+    def is_open(self) -> bool:
+        return not self.is_empty() and not self.lo_closed and not self.hi_closed
+
+    def __str__(self) -> str:
+        if self.lo == self.hi and self.lo_closed and self.hi_closed:
+            return '{' + _format_number(self.lo) + '}'
+        return ('[' if self.lo_closed else '(') + _format_number(self.lo) + ',' + \
+            _format_number(self.hi) + (']' if self.hi_closed else ')')
+
+
+def _format_number(value: float) -> str:
+    if value == math.inf:
+        return '∞'
+    if value == -math.inf:
+        return '-∞'
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+_NUMBER = r'\s*([+-]?(?:∞|inf|\d+(?:\.\d*)?|\.\d+))\s*'
+_INTERVAL_RE = re.compile(r'([\[(])' + _NUMBER + ',' + _NUMBER + r'([\])])')
+_POINT_RE = re.compile(r'\{' + _NUMBER + r'\}')
+
+
+def _parse_number(text: str) -> float:
+    text = text.replace('∞', 'inf')
+    return float(text)
+
+
+def parse_interval_union(text: str) -> List[Interval]:
+    """
+    Interpreta una unión de intervalos como '[0,1) ∪ (2,∞)' o '{3}'
+
+    Returns:
+        Lista de intervalos disjuntos, ordenados y no vacíos
+    """
+    intervals = []
+    for part in re.split(r'∪|\bU\b', text):
+        part = part.strip()
+        if not part or part == '∅':
+            continue
+        match = _INTERVAL_RE.fullmatch(part)
+        if match:
+            lo, hi = _parse_number(match.group(2)), _parse_number(match.group(3))
+            intervals.append(Interval(lo, hi, match.group(1) == '[' and lo != -math.inf,
+                                      match.group(4) == ']' and hi != math.inf))
+            continue
+        match = _POINT_RE.fullmatch(part)
+        if match:
+            value = _parse_number(match.group(1))
+            intervals.append(Interval(value, value, True, True))
+            continue
+        raise ValueError(f'No se reconoce el intervalo {part!r}')
+    return normalize_intervals(intervals)
+
+
+def normalize_intervals(intervals: List[Interval]) -> List[Interval]:
+    """Ordena los intervalos y fusiona los que se solapan o se tocan"""
+    merged = []
+    for current in sorted((i for i in intervals if not i.is_empty()),
+                          key=lambda i: (i.lo, not i.lo_closed)):
+        if merged:
+            last = merged[-1]
+            touches = current.lo < last.hi or (current.lo == last.hi and (last.hi_closed or current.lo_closed))
+            if touches:
+                if current.hi > last.hi or (current.hi == last.hi and current.hi_closed):
+                    merged[-1] = Interval(last.lo, current.hi, last.lo_closed, current.hi_closed)
+                continue
+        merged.append(current)
+    return merged
+
+
+def format_interval_union(intervals: List[Interval]) -> str:
+    """Representación canónica de una unión de intervalos"""
+    return ' ∪ '.join(str(i) for i in intervals) if intervals else '∅'
+
+
+class WitnessCover(NamedTuple):
+    """Recubrimiento abierto infinito {U_n : n ≥ 1} sin subrecubrimiento finito"""
+    description: str
+    member: Callable[[int], List[Interval]]
+
+    def members(self, count: int) -> List[List[Interval]]:
+        """Primeros count miembros U_1, ..., U_count"""
+        return [self.member(n) for n in range(1, count + 1)]
+
+
+class CompactnessResult(NamedTuple):
+    """Resultado del análisis de compacidad de un conjunto"""
+    is_compact: bool
+    subcover: Optional[List[int]]
+    witness: Optional[WitnessCover]
+
+
+def finite_subcover(space: TopologicalSpace, cover: List[Set], subset: Set = None) -> List[int]:
+    """
+    Extrae un subrecubrimiento finito pequeño de un recubrimiento abierto
+
+    Cada abierto se codifica como un entero usado como bitset y se aplica el
+    algoritmo voraz de set cover (con evaluación perezosa de las ganancias en
+    un heap, ya que éstas solo pueden disminuir). Finalmente se descartan los
+    miembros redundantes, de modo que el resultado es minimal.
+
+    Args:
+        space: Espacio topológico finito
+        cover: Familia de abiertos del espacio
+        subset: Conjunto a cubrir (por defecto todo el universo)
+
+    Returns:
+        Índices en cover de los abiertos elegidos
+    """
+    target = set(space.universe if subset is None else subset)
+    labels = _ordered_labels(space.universe)
+    index = {label: i for i, label in enumerate(labels)}
+    order = space.specialization_order()
+
+    masks, first_index = [], {}
+    for position, member in enumerate(cover):
+        member = set(member)
+        if not order.is_open(member):
+            raise ValueError(f'El miembro {position} del recubrimiento no es abierto')
+        mask = 0
+        for point in member:
+            mask |= 1 << index[point]
+        if mask not in first_index:
+            first_index[mask] = position
+            masks.append(mask)
+
+    goal = 0
+    for point in target:
+        goal |= 1 << index[point]
+
+    uncovered = goal
+    for mask in masks:
+        uncovered &= ~mask
+    if uncovered:
+        missing = {labels[i] for i in range(len(labels)) if uncovered >> i & 1}
+        raise ValueError(f'El recubrimiento no cubre los puntos {missing}')
+
+    heap = [(-bin(mask & goal).count('1'), i) for i, mask in enumerate(masks)]
+    heapq.heapify(heap)
+    chosen, remaining = [], goal
+    while remaining:
+        _, i = heapq.heappop(heap)
+        gain = bin(masks[i] & remaining).count('1')
+        if heap and gain < -heap[0][0]:
+            heapq.heappush(heap, (-gain, i))
+            continue
+        chosen.append(masks[i])
+        remaining &= ~masks[i]
+
+    # Eliminar miembros redundantes
+    for position in reversed(range(len(chosen))):
+        others = 0
+        for other in chosen[:position] + chosen[position + 1:]:
+            others |= other
+        if goal & ~others == 0:
+            del chosen[position]
+    return [first_index[mask] for mask in chosen]
+
+
+def interval_subcover(target: List[Interval], cover: List[List[Interval]]) -> List[int]:
+    """
+    Extrae un subrecubrimiento finito de un recubrimiento por uniones de intervalos abiertos
+
+    Los intervalos de todos los miembros se ordenan por extremo izquierdo y
+    se recorren una sola vez (O(k log k)): en cada paso se elige, entre los
+    intervalos que empiezan antes del primer punto aún no cubierto, el que
+    llega más lejos. Para recubrimientos por intervalos el número de
+    intervalos elegidos es mínimo.
+
+    Args:
+        target: Conjunto a cubrir como unión de intervalos
+        cover: Miembros del recubrimiento, cada uno una unión de intervalos abiertos
+
+    Returns:
+        Índices en cover de los miembros elegidos
+    """
+    pieces = []
+    for position, member in enumerate(cover):
+        for piece in member:
+            if piece.is_empty():
+                continue
+            if not piece.is_open():
+                raise ValueError(f'El miembro {position} del recubrimiento no es abierto')
+            pieces.append((piece.lo, piece.hi, position))
+    pieces.sort()
+
+    chosen, cursor = [], 0
+    best_hi, best_member = -math.inf, None
+    for component in normalize_intervals(target):
+        point, required = component.lo, component.lo_closed
+        while True:
+            # Intervalos que cubren un entorno derecho de point (y a point si se requiere)
+            while cursor < len(pieces) and (pieces[cursor][0] < point or
+                                            (not required and pieces[cursor][0] == point)):
+                if pieces[cursor][1] > best_hi:
+                    best_hi, best_member = pieces[cursor][1], pieces[cursor][2]
+                cursor += 1
+            if best_hi <= point:
+                raise ValueError(f'El recubrimiento no cubre el punto {_format_number(point)}')
+            if not chosen or chosen[-1] != best_member:
+                chosen.append(best_member)
+            if best_hi > component.hi or (best_hi == component.hi and not component.hi_closed):
+                break
+            point, required = best_hi, True
+    return sorted(set(chosen))
+
+
+def noncompactness_witness(target: List[Interval]) -> Optional[WitnessCover]:
+    """
+    Recubrimiento abierto sin subrecubrimiento finito (Heine-Borel)
+
+    Si el conjunto no es acotado se usa U_n = (-n, n). Si no es cerrado, se
+    toma un punto adherente p que no pertenece al conjunto y
+    U_n = ℝ \\ [p - 1/n, p + 1/n]. Devuelve None si el conjunto es compacto.
+    """
+    target = normalize_intervals(target)
+    if not target:
+        return None
+    if target[0].lo == -math.inf or target[-1].hi == math.inf:
+        return WitnessCover('U_n = (-n, n)', lambda n: [Interval(-n, n)])
+    for component in target:
+        for point, closed in ((component.lo, component.lo_closed), (component.hi, component.hi_closed)):
+            if not closed:
+                return WitnessCover(
+                    f'U_n = ℝ \\ [{_format_number(point)} - 1/n, {_format_number(point)} + 1/n]',
+                    lambda n, p=point: [Interval(-math.inf, p - 1 / n), Interval(p + 1 / n, math.inf)])
+    return None
+
+
+def analyze_compactness(target: List[Interval], cover: List[List[Interval]] = None) -> CompactnessResult:
+    """
+    Analiza la compacidad de un subconjunto acotado o no de ℝ
+
+    Si se proporciona un recubrimiento se extrae de él un subrecubrimiento
+    finito; si el conjunto no es compacto se incluye además un recubrimiento
+    testigo sin subrecubrimiento finito.
+    """
+    witness = noncompactness_witness(target)
+    subcover = interval_subcover(target, cover) if cover is not None else None
+    return CompactnessResult(witness is None, subcover, witness)
+
+
+# Evaluación de expresiones de conjuntos
+
+def _parse_element(text: str):
+    """Interpreta un elemento de un conjunto escrito entre llaves"""
+    text = text.strip()
+    try:
+        value = _parse_number(text)
+    except ValueError:
+        return text
+    return int(value) if value.is_integer() else value
+
+
+def _parse_elements(text: str) -> frozenset:
+    """Elementos de un literal '{a, b, ...}'"""
+    inner = text.strip()[1:-1].strip()
+    return frozenset(_parse_element(e) for e in inner.split(',')) if inner else frozenset()
+
+
+def _format_elements(elements) -> str:
+    if not elements:
+        return '∅'
+    return '{' + ', '.join(_format_number(e) if isinstance(e, (int, float)) else str(e)
+                           for e in _ordered_labels(elements)) + '}'
+
+
+def normalize_subset(subset) -> str:
+    """
+    Forma canónica de un subconjunto enviado al API
+
+    Acepta una lista de puntos o un texto como '{2, 1}' o '[0, 1) ∪ {3}'.
+    Conjuntos finitos e intervalos se reescriben en su forma canónica sin
+    espacios; en cualquier otro texto solo se colapsan los espacios en blanco.
+    """
+    if subset is None:
+        return ''
+    if isinstance(subset, (list, tuple, set, frozenset)):
+        elements = frozenset(subset)
+    else:
+        text = ' '.join(str(subset).split())
+        if text.startswith('{') and text.endswith('}') and text.count('{') == 1:
+            elements = _parse_elements(text)
+        else:
+            try:
+                return format_interval_union(parse_interval_union(text))
+            except ValueError:
+                return text
+    if not elements:
+        return '∅'
+    return '{' + ','.join(_format_number(e) if isinstance(e, (int, float)) else str(e)
+                          for e in _ordered_labels(elements)) + '}'
+
+
+class _FiniteAlgebra:
+    """Subconjuntos de un universo finito"""
+
+    universe_symbols = ('X',)
+
+    def __init__(self, universe: Set):
+        self.universe = frozenset(universe)
+
+    def universe_value(self):
+        return self.universe
+
+    def elements(self, text: str):
+        elements = _parse_elements(text)
+        if not elements <= self.universe:
+            raise ValueError(f'{_format_elements(elements - self.universe)} no pertenece a X = '
+                             f'{_format_elements(self.universe)}')
+        return elements
+
+    def interval(self, interval: Interval):
+        raise ValueError('Los intervalos no están definidos en un espacio finito')
+
+    def union(self, a, b):
+        return a | b
+
+    def intersection(self, a, b):
+        return a & b
+
+    def complement(self, a):
+        return self.universe - a
+
+    def format(self, a) -> str:
+        return _format_elements(a)
+
+
+class _IntervalAlgebra:
+    """Uniones finitas de intervalos de ℝ, normalizadas como tuplas disjuntas y ordenadas"""
+
+    universe_symbols = ('ℝ', 'X')
+
+    def universe_value(self):
+        return (Interval(-math.inf, math.inf),)
+
+    def elements(self, text: str):
+        points = []
+        for e in _parse_elements(text):
+            if not isinstance(e, (int, float)):
+                raise ValueError(f'{e!r} no es un número real')
+            points.append(Interval(e, e, True, True))
+        return tuple(normalize_intervals(points))
+
+    def interval(self, interval: Interval):
+        return tuple(normalize_intervals([interval]))
+
+    def union(self, a, b):
+        return tuple(normalize_intervals(list(a) + list(b)))
+
+    def intersection(self, a, b):
+        return self.complement(self.union(self.complement(a), self.complement(b)))
+
+    def complement(self, a):
+        gaps, lo, lo_closed = [], -math.inf, False
+        for interval in a:
+            gaps.append(Interval(lo, interval.lo, lo_closed, not interval.lo_closed))
+            lo, lo_closed = interval.hi, not interval.hi_closed
+        gaps.append(Interval(lo, math.inf, lo_closed, False))
+        return tuple(normalize_intervals(gaps))
+
+    def format(self, a) -> str:
+        return format_interval_union(list(a))
+
+
+class NaturalSubset(NamedTuple):
+    """Subconjunto finito o cofinito de ℕ: elements, o ℕ \\ elements si cofinite"""
+    elements: frozenset
+    cofinite: bool
+
+
+class _CofiniteAlgebra:
+    """Subconjuntos finitos y cofinitos de ℕ (cerrados bajo todas las operaciones)"""
+
+    universe_symbols = ('ℕ', 'X')
+
+    def universe_value(self):
+        return NaturalSubset(frozenset(), True)
+
+    def elements(self, text: str):
+        elements = _parse_elements(text)
+        if any(not isinstance(e, int) or e < 0 for e in elements):
+            raise ValueError('Los elementos deben ser números naturales')
+        return NaturalSubset(elements, False)
+
+    def interval(self, interval: Interval):
+        raise ValueError('Los intervalos no están definidos en ℕ')
+
+    def union(self, a, b):
+        if a.cofinite and b.cofinite:
+            return NaturalSubset(a.elements & b.elements, True)
+        if a.cofinite or b.cofinite:
+            finite, cofinite = (b, a) if a.cofinite else (a, b)
+            return NaturalSubset(cofinite.elements - finite.elements, True)
+        return NaturalSubset(a.elements | b.elements, False)
+
+    def intersection(self, a, b):
+        return self.complement(self.union(self.complement(a), self.complement(b)))
+
+    def complement(self, a):
+        return NaturalSubset(a.elements, not a.cofinite)
+
+    def format(self, a) -> str:
+        if not a.cofinite:
+            return _format_elements(a.elements)
+        return 'ℕ' if not a.elements else 'ℕ \\ ' + _format_elements(a.elements)
+
+
+_SET_ALGEBRAS = {
+    'real_line': _IntervalAlgebra,
+    'discrete': lambda: _FiniteAlgebra({1, 2, 3, 4}),
+    'indiscrete': lambda: _FiniteAlgebra({1, 2, 3, 4}),
+    'cofinite': _CofiniteAlgebra,
+}
+
+_BINARY_OPERATORS = {'∪': 'union', '∩': 'intersection', '\\': 'difference', 'Δ': 'symmetric_difference'}
+# Operaciones conmutativas: sus operandos se ordenan en la clave canónica
+_COMMUTATIVE = {'union', 'intersection', 'symmetric_difference'}
+# Operaciones además asociativas e idempotentes: se aplanan y se eliminan duplicados
+_FLATTENED = {'union', 'intersection'}
+# Precedencia de los operadores binarios: ∩ liga más que ∪, \ y Δ
+_PRECEDENCE = {'∩': 2, '∪': 1, '\\': 1, 'Δ': 1}
+
+
+def _value_bytes(value) -> int:
+    """Tamaño aproximado en memoria de un valor de la caché"""
+    if isinstance(value, NaturalSubset):
+        value = value.elements
+    return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+
+
+class SetExpressionEvaluator:
+    """
+    Evaluador de expresiones de conjuntos sobre un espacio soportado
+
+    Cada expresión se compila a un DAG: los nodos reciben un identificador
+    entero a partir de una clave canónica (literales normalizados,
+    operación e identificadores de los operandos, ordenados en las
+    operaciones conmutativas), de modo que subexpresiones repetidas,
+    dentro de una expresión o entre expresiones sucesivas, comparten nodo.
+    Los valores de los nodos se guardan en una caché LRU acotada por
+    entradas y por bytes, y solo se calculan los nodos que no están en ella.
+    """
+
+    def __init__(self, space_type: str, max_cache: int = 4096, max_bytes: int = 16 * 2**20,
+                 max_nodes: int = 65536):
+        """
+        Inicializa el evaluador
+
+        Args:
+            space_type: Espacio sobre el que se evalúa ('real_line', 'discrete',
+                'indiscrete' o 'cofinite')
+            max_cache: Número máximo de subexpresiones cacheadas
+            max_bytes: Tamaño máximo aproximado de los valores cacheados
+            max_nodes: Número máximo de claves canónicas recordadas
+        """
+        if space_type not in _SET_ALGEBRAS:
+            raise ValueError(f'Operaciones no soportadas en el espacio {space_type!r}')
+        self.space_type = space_type
+        self.algebra = _SET_ALGEBRAS[space_type]()
+        self.max_cache = max_cache
+        self.max_bytes = max_bytes
+        self.max_nodes = max_nodes
+        self._ids = OrderedDict()
+        self._next_id = 0
+        self._cache = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # Análisis léxico
+
+    def _tokenize(self, text: str) -> List[Tuple[str, object]]:
+        tokens, pos = [], 0
+        while pos < len(text):
+            char = text[pos]
+            if char.isspace():
+                pos += 1
+                continue
+            match = _INTERVAL_RE.match(text, pos) if char in '([' else None
+            if match:
+                lo, hi = _parse_number(match.group(2)), _parse_number(match.group(3))
+                interval = Interval(lo, hi, match.group(1) == '[' and lo != -math.inf,
+                                    match.group(4) == ']' and hi != math.inf)
+                tokens.append(('value', self.algebra.interval(interval)))
+                pos = match.end()
+            elif char == '{':
+                end = text.find('}', pos)
+                if end < 0:
+                    raise ValueError('Falta cerrar una llave')
+                tokens.append(('value', self.algebra.elements(text[pos:end + 1])))
+                pos = end + 1
+            elif char == '∅':
+                tokens.append(('value', self.algebra.complement(self.algebra.universe_value())))
+                pos += 1
+            elif char in self.algebra.universe_symbols:
+                tokens.append(('value', self.algebra.universe_value()))
+                pos += 1
+            elif char in _BINARY_OPERATORS or char in '()ᶜ':
+                tokens.append((char, None))
+                pos += 1
+            else:
+                raise ValueError(f'Símbolo inesperado {char!r} en la posición {pos}')
+        return tokens
+
+    # Compilación a DAG
+
+    def _intern(self, key: tuple) -> int:
+        """Identificador estable de una clave canónica (con el bloqueo tomado)"""
+        node = self._ids.get(key)
+        if node is not None:
+            self._ids.move_to_end(key)
+            return node
+        node = self._next_id
+        self._next_id += 1
+        self._ids[key] = node
+        while len(self._ids) > self.max_nodes:
+            # Los identificadores no se reutilizan: basta con olvidar su valor
+            _, evicted = self._ids.popitem(last=False)
+            if evicted in self._cache:
+                self._remove(evicted)
+        return node
+
+    def compile(self, text: str) -> Tuple[int, Dict[int, tuple]]:
+        """
+        Compila una expresión a un DAG de subexpresiones únicas
+
+        El análisis sintáctico es iterativo (shunting-yard), así que ni la
+        longitud ni el anidamiento de la expresión están limitados por la
+        pila de Python. Las cadenas de ∪ o de ∩ se acumulan en un único nodo
+        n-ario en lugar de un árbol con un nodo por operando.
+
+        Returns:
+            Identificador del nodo raíz y diccionario id -> (operación, operandos),
+            con los operandos siempre antes que las operaciones que los usan
+        """
+        tokens = self._tokenize(text)
+        nodes = {}
+        # Operandos: identificadores o grupos [operación, ids] aún abiertos
+        operands, operators = [], []
+
+        def intern(operator, children):
+            node = self._intern((operator, children))
+            nodes.setdefault(node, (operator, children))
+            return node
+
+        def flatten(operator, node):
+            kind, children = nodes[node]
+            return list(children) if kind == operator else [node]
+
+        def finish(operand) -> int:
+            if isinstance(operand, int):
+                return operand
+            operator, children = operand
+            children = tuple(sorted(set(children)))
+            return children[0] if len(children) == 1 else intern(operator, children)
+
+        def reduce():
+            operator = _BINARY_OPERATORS[operators.pop()]
+            right = finish(operands.pop())
+            left = operands.pop()
+            if operator in _FLATTENED:
+                if not (isinstance(left, list) and left[0] == operator):
+                    left = [operator, flatten(operator, finish(left))]
+                left[1].extend(flatten(operator, right))
+                operands.append(left)
+            else:
+                children = (finish(left), right)
+                operands.append(intern(operator, tuple(sorted(children)) if operator in _COMMUTATIVE else children))
+
+        with self._lock:
+            expect_operand = True
+            for kind, value in tokens:
+                if expect_operand and kind == 'value':
+                    node = self._intern(('value', self.algebra.format(value)))
+                    nodes.setdefault(node, ('value', value))
+                    operands.append(node)
+                    expect_operand = False
+                elif expect_operand and kind == '(':
+                    operators.append(kind)
+                elif not expect_operand and kind == 'ᶜ':
+                    operands.append(intern('complement', (finish(operands.pop()),)))
+                elif not expect_operand and kind in _BINARY_OPERATORS:
+                    while operators and operators[-1] != '(' and _PRECEDENCE[operators[-1]] >= _PRECEDENCE[kind]:
+                        reduce()
+                    operators.append(kind)
+                    expect_operand = True
+                elif not expect_operand and kind == ')' and '(' in operators:
+                    while operators[-1] != '(':
+                        reduce()
+                    operators.pop()
+                else:
+                    raise ValueError(f'Símbolo inesperado {kind!r}')
+            if expect_operand:
+                raise ValueError('Expresión incompleta')
+            while operators:
+                if operators[-1] == '(':
+                    raise ValueError('Falta cerrar un paréntesis')
+                reduce()
+            return finish(operands.pop()), nodes
+
+    # Evaluación
+
+    def _apply(self, operator: str, values: List):
+        algebra = self.algebra
+        if operator == 'complement':
+            return algebra.complement(values[0])
+        if operator == 'difference':
+            return algebra.intersection(values[0], algebra.complement(values[1]))
+        if operator == 'symmetric_difference':
+            a, b = values
+            return algebra.union(algebra.intersection(a, algebra.complement(b)),
+                                 algebra.intersection(b, algebra.complement(a)))
+        # Combinación por parejas en árbol equilibrado, no en cadena
+        combine = algebra.union if operator == 'union' else algebra.intersection
+        while len(values) > 1:
+            values = [combine(*values[i:i + 2]) if i + 1 < len(values) else values[i]
+                      for i in range(0, len(values), 2)]
+        return values[0]
+
+    def _lookup(self, node: int):
+        with self._lock:
+            if node in self._cache:
+                self._cache.move_to_end(node)
+                self.hits += 1
+                return True, self._cache[node][0]
+            self.misses += 1
+            return False, None
+
+    def _store(self, node: int, value):
+        size = _value_bytes(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if node in self._cache:
+                self._remove(node)
+            self._cache[node] = (value, size)
+            self._bytes += size
+            while len(self._cache) > self.max_cache or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._cache)))
+
+    def _remove(self, node: int):
+        _, size = self._cache.pop(node)
+        self._bytes -= size
+
+    def evaluate_value(self, text: str):
+        """Valor canónico de la expresión (frozenset, tupla de intervalos o NaturalSubset)"""
+        root, nodes = self.compile(text)
+        values, needed = {}, {root}
+        # De la raíz hacia las hojas: los nodos cacheados no necesitan sus operandos
+        for node in reversed(list(nodes)):
+            if node not in needed:
+                continue
+            operator, operands = nodes[node]
+            if operator == 'value':
+                values[node] = operands
+                continue
+            found, value = self._lookup(node)
+            if found:
+                values[node] = value
+            else:
+                needed.update(operands)
+        # De las hojas hacia la raíz: se calcula lo que falta
+        for node, (operator, operands) in nodes.items():
+            if node in needed and node not in values:
+                values[node] = self._apply(operator, [values[child] for child in operands])
+                self._store(node, values[node])
+        return values[root]
+
+    def evaluate(self, text: str) -> str:
+        """Resultado canónico de la expresión como texto"""
+        return self.algebra.format(self.evaluate_value(text))
+
+    def stats(self) -> Dict:
+        """Estadísticas de la caché de subexpresiones"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._cache),
+                'bytes': self._bytes,
+                'nodes': len(self._ids),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0
+            }
+
+
+_evaluators = {}
+_evaluators_lock = threading.Lock()
+
+
+def get_set_evaluator(space_type: str) -> SetExpressionEvaluator:
+    """Evaluador compartido (y su caché) para un tipo de espacio"""
+    with _evaluators_lock:
+        if space_type not in _evaluators:
+            _evaluators[space_type] = SetExpressionEvaluator(space_type)
+        return _evaluators[space_type]
+
+
+def evaluate_set_expression(expression: str, space_type: str = 'real_line') -> str:
+    """Evalúa una expresión como '([0,1) ∪ (2,3))ᶜ ∩ (-1,5)' en el espacio dado"""
+    return get_set_evaluator(space_type).evaluate(expression)
+
 
 def analyze_openness(space_type: str, subset_str: str) -> bool:
     """Analiza si un conjunto es abierto en el espacio dado"""
@@ -208,16 +1354,21 @@ def check_compactness(space_type: str) -> bool:
     return compactness.get(space_type, False)
 
 
-def set_operations(operation: str, set_a: str, set_b: str) -> str:
-    """Realiza operaciones entre conjuntos"""
+def set_operations(operation: str, set_a: str, set_b: str, space_type: str = 'real_line') -> str:
+    """Realiza operaciones entre conjuntos y devuelve el resultado canónico"""
     operations = {
-        'union': f'{set_a} ∪ {set_b}',
-        'intersection': f'{set_a} ∩ {set_b}',
-        'difference': f'{set_a} \\ {set_b}',
-        'complement': f'Complemento de {set_a}',
-        'symmetric_difference': f'{set_a} Δ {set_b}'
+        'union': f'({set_a}) ∪ ({set_b})',
+        'intersection': f'({set_a}) ∩ ({set_b})',
+        'difference': f'({set_a}) \\ ({set_b})',
+        'complement': f'({set_a})ᶜ',
+        'symmetric_difference': f'({set_a}) Δ ({set_b})'
     }
-    return operations.get(operation, 'Operación desconocida')
+    if operation not in operations:
+        return 'Operación desconocida'
+    operands = (set_a,) if operation == 'complement' else (set_a, set_b)
+    if any(operand is None or not str(operand).strip() for operand in operands):
+        raise ValueError('Faltan conjuntos para la operación')
+    return evaluate_set_expression(operations[operation], space_type)
 
 
 def create_subspace(original_space_type: str, subspace: str) -> Dict:
@@ -0,0 +1,367 @@
+"""
+Pool de procesos para los análisis costosos del API
+
+Los cálculos sobre topologías enviadas por el usuario (puntos límite,
+recubrimientos, expresiones de conjuntos) se ejecutan en procesos
+persistentes en lugar del hilo de la petición. Cada tarea tiene un
+presupuesto de tiempo real y de CPU; si lo excede se cancela, y si el
+proceso no responde se reemplaza. Cuando todos los procesos están ocupados
+la petición se rechaza de inmediato en lugar de encolarse sin límite.
+"""
+
+import math
+import multiprocessing
+import signal
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict
+
+from space_registry import PackedSpace, encode_space, get_registry
+from topology import (
+    TopologicalSpace,
+    _ordered_labels,
+    _parse_elements,
+    analyze_compactness,
+    evaluate_set_expression,
+    format_interval_union,
+    parse_interval_union,
+    set_operations
+)
+
+try:
+    import resource
+except ImportError:  # Windows: sin límite de CPU por tarea
+    resource = None
+
+
+class AnalysisUnavailable(Exception):
+    """El análisis no pudo completarse por falta de recursos"""
+
+
+class PoolSaturatedError(AnalysisUnavailable):
+    """Todos los procesos del pool están ocupados"""
+
+
+class TaskTimeoutError(Exception):
+    """La tarea excedió su presupuesto de tiempo o de CPU (repetirla no ayuda)"""
+
+
+class _BudgetExceeded(BaseException):
+    """Se lanza dentro del proceso de trabajo al agotarse el presupuesto"""
+
+
+# Tareas ejecutadas dentro de los procesos de trabajo
+
+class _WorkerContext:
+    """Estado que se conserva entre tareas en un proceso de trabajo"""
+
+    def __init__(self, registry_path: str, max_bytes: int = 64 * 2**20):
+        self.registry_path = registry_path
+        self.max_bytes = max_bytes
+        self.spaces = OrderedDict()
+        self._bytes = 0
+
+    def space(self, space_id: str) -> PackedSpace:
+        """
+        Espacio registrado, consultado sobre el archivo mapeado
+
+        Solo se conservan las etiquetas y su índice (la memoria propia del
+        proceso); las filas U_x son páginas compartidas del registro.
+        """
+        if space_id in self.spaces:
+            self.spaces.move_to_end(space_id)
+            return self.spaces[space_id]
+        space = get_registry(self.registry_path).space(space_id)
+        self.spaces[space_id] = space
+        self._bytes += space.nbytes
+        while self._bytes > self.max_bytes and len(self.spaces) > 1:
+            _, evicted = self.spaces.popitem(last=False)
+            self._bytes -= evicted.nbytes
+        return space
+
+
+def _analyze_registered_subset(context: _WorkerContext, space_id: str, subset) -> Dict:
+    space = context.space(space_id)
+    subset = set(_parse_elements(subset) if isinstance(subset, str) else subset)
+    if any(p not in space.index for p in subset):
+        raise ValueError('El subconjunto debe estar contenido en el universo del espacio')
+    interior, closure = space.interior(subset), space.closure(subset)
+    return {
+        'is_open': interior == subset,
+        'is_closed': closure == subset,
+        'interior': _ordered_labels(interior),
+        'closure': _ordered_labels(closure),
+        'boundary': _ordered_labels(closure - interior),
+        'limit_points': _ordered_labels(space.limit_points(subset))
+    }
+
+
+def _encode_space(context: _WorkerContext, universe: set, generators: list,
+                  name: str, description: str) -> bytes:
+    # Registro con los abiertos mínimos U_x de la topología generada
+    return encode_space(TopologicalSpace(universe, generators), name, description)
+
+
+def _compactness(context: _WorkerContext, target: str, cover) -> Dict:
+    members = [parse_interval_union(member) for member in cover] if cover is not None else None
+    result = analyze_compactness(parse_interval_union(target), members)
+    return {
+        'set': format_interval_union(parse_interval_union(target)),
+        'is_compact': result.is_compact,
+        'subcover': [cover[i] for i in result.subcover] if result.subcover is not None else None,
+        'subcover_indices': result.subcover,
+        'witness': result.witness.description if result.witness else None,
+        'witness_members': [format_interval_union(m) for m in result.witness.members(3)]
+                           if result.witness else None
+    }
+
+
+def _set_expression(context: _WorkerContext, expression: str, space_type: str) -> str:
+    return evaluate_set_expression(expression, space_type)
+
+
+def _set_operations(context: _WorkerContext, operation: str, set_a: str, set_b: str, space_type: str) -> str:
+    return set_operations(operation, set_a, set_b, space_type)
+
+
+TASKS = {
+    'analyze_registered_subset': _analyze_registered_subset,
+    'compactness': _compactness,
+    'encode_space': _encode_space,
+    'set_expression': _set_expression,
+    'set_operations': _set_operations,
+}
+
+
+def _raise_budget_exceeded(signum, frame):
+    raise _BudgetExceeded()
+
+
+def _set_cpu_budget(seconds):
+    """Límite blando de CPU relativo al consumo actual del proceso"""
+    if resource is None:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if seconds is None:
+        soft = hard
+    else:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = math.ceil(usage.ru_utime + usage.ru_stime + seconds)
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _worker_main(connection, registry_path: str):
+    """Bucle de un proceso de trabajo: recibe tareas hasta recibir None"""
+    context = _WorkerContext(registry_path)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if hasattr(signal, 'setitimer'):
+        signal.signal(signal.SIGALRM, _raise_budget_exceeded)
+    if hasattr(signal, 'SIGXCPU'):
+        signal.signal(signal.SIGXCPU, _raise_budget_exceeded)
+    # Listo: los módulos ya están importados y no cuentan en el presupuesto
+    connection.send(('ready', None))
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            return
+        name, args, time_budget, cpu_budget = message
+        try:
+            try:
+                if hasattr(signal, 'setitimer'):
+                    signal.setitimer(signal.ITIMER_REAL, time_budget)
+                _set_cpu_budget(cpu_budget)
+                reply = ('ok', TASKS[name](context, *args))
+            finally:
+                if hasattr(signal, 'setitimer'):
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+                _set_cpu_budget(None)
+        except _BudgetExceeded:
+            reply = ('timeout', None)
+        except Exception as e:
+            reply = ('error', str(e))
+        # Se informa de los espacios que siguen cargados tras la tarea
+        try:
+            connection.send(reply + (tuple(context.spaces),))
+        except Exception as e:
+            # Resultado no serializable: se informa en lugar de terminar el proceso
+            connection.send(('error', f'Resultado no válido: {e}', tuple(context.spaces)))
+
+
+# Lado del servidor
+
+class _Worker:
+    """Proceso de trabajo y su extremo de la tubería"""
+
+    def __init__(self, context, registry_path: str, startup_timeout: float = 30.0):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child, registry_path), daemon=True)
+        self.process.start()
+        child.close()
+        if not self.connection.poll(startup_timeout) or self.connection.recv()[0] != 'ready':
+            self.stop(graceful=False)
+            raise AnalysisUnavailable('No se pudo iniciar un proceso de análisis')
+        # Espacios que el proceso tiene decodificados (copia de su LRU)
+        self.loaded = frozenset()
+
+    def stop(self, graceful: bool = True):
+        if graceful and self.process.is_alive():
+            try:
+                self.connection.send(None)
+                self.process.join(1)
+            except (OSError, EOFError):
+                pass
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+class AnalysisPool:
+    """
+    Pool acotado de procesos de trabajo persistentes
+
+    Los procesos se crean al primer uso y se reutilizan, de modo que
+    conservan los espacios ya cargados del registro; al elegir un proceso
+    libre se prefiere uno que ya tenga cargado el espacio de la tarea.
+    """
+
+    def __init__(self, registry_path: str, workers: int = 2, time_budget: float = 5.0,
+                 cpu_budget: float = 5.0, queue_timeout: float = 0.5, grace: float = 1.0):
+        """
+        Inicializa el pool
+
+        Args:
+            registry_path: Registro de espacios que los procesos cargan bajo demanda
+            workers: Número de procesos de trabajo
+            time_budget: Segundos de tiempo real por tarea
+            cpu_budget: Segundos de CPU por tarea
+            queue_timeout: Espera máxima por un proceso libre antes de responder 503
+            grace: Margen tras el presupuesto antes de reemplazar un proceso que no responde
+        """
+        self.registry_path = registry_path
+        self.size = workers
+        self.time_budget = time_budget
+        self.cpu_budget = cpu_budget
+        self.queue_timeout = queue_timeout
+        self.grace = grace
+        self._context = multiprocessing.get_context('spawn')
+        self._idle = []
+        self._started = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def _acquire(self, space_id: str = None) -> _Worker:
+        deadline = time.monotonic() + self.queue_timeout
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise AnalysisUnavailable('El pool de análisis está cerrado')
+                if self._idle:
+                    for worker in self._idle:
+                        if space_id in worker.loaded:
+                            self._idle.remove(worker)
+                            return worker
+                    return self._idle.pop()
+                if self._started < self.size:
+                    self._started += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejected += 1
+                    raise PoolSaturatedError('El servidor está ocupado; inténtalo de nuevo en unos segundos')
+                self._condition.wait(remaining)
+        try:
+            return _Worker(self._context, self.registry_path)
+        except BaseException:
+            with self._condition:
+                self._started -= 1
+            raise
+
+    def _release(self, worker: _Worker):
+        with self._condition:
+            if self._closed:
+                worker.stop()
+                return
+            self._idle.append(worker)
+            self._condition.notify()
+
+    def _discard(self, worker: _Worker):
+        worker.stop(graceful=False)
+        with self._condition:
+            self._started -= 1
+            self._condition.notify()
+
+    def run(self, task: str, *args, space_id: str = None, time_budget: float = None):
+        """
+        Ejecuta una tarea en un proceso de trabajo y devuelve su resultado
+
+        Raises:
+            PoolSaturatedError: si no hay un proceso libre a tiempo
+            TaskTimeoutError: si la tarea agota su presupuesto
+            AnalysisUnavailable: si el proceso de trabajo termina inesperadamente
+            ValueError: si la tarea falla por datos inválidos
+        """
+        if task not in TASKS:
+            raise ValueError(f'Tarea desconocida {task!r}')
+        time_budget = self.time_budget if time_budget is None else time_budget
+        worker = self._acquire(space_id)
+        try:
+            worker.connection.send((task, args, time_budget, self.cpu_budget))
+            responded = worker.connection.poll(time_budget + self.grace)
+            if responded:
+                status, value, loaded = worker.connection.recv()
+        except (OSError, EOFError):
+            # El proceso murió (falta de memoria, fallo): se reemplaza
+            self._discard(worker)
+            with self._condition:
+                self.failures += 1
+            raise AnalysisUnavailable('El proceso de análisis terminó inesperadamente')
+        if not responded:
+            # No respondió dentro del presupuesto: se reemplaza
+            self._discard(worker)
+            with self._condition:
+                self.timeouts += 1
+            raise TaskTimeoutError('El análisis excedió el tiempo permitido')
+
+        worker.loaded = frozenset(loaded)
+        self._release(worker)
+        with self._condition:
+            if status == 'timeout':
+                self.timeouts += 1
+            else:
+                self.completed += 1
+        if status == 'timeout':
+            raise TaskTimeoutError('El análisis excedió el tiempo permitido')
+        if status == 'error':
+            raise ValueError(value)
+        return value
+
+    def stats(self) -> Dict:
+        """Estado del pool"""
+        with self._condition:
+            return {
+                'workers': self._started,
+                'idle': len(self._idle),
+                'max_workers': self.size,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'failures': self.failures
+            }
+
+    def shutdown(self):
+        """Detiene todos los procesos libres; los ocupados se detienen al terminar"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for worker in idle:
+            worker.stop()